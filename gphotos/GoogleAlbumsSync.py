@@ -1,3 +1,4 @@
+import concurrent.futures as futures
 import logging
 import os.path
 import shutil
@@ -244,9 +245,9 @@ class GoogleAlbumsSync(object):
 
     def create_album_content_links(self):
         log.warning("Creating album folder links to media ...")
-        count = 0
         album_item = 0
         current_rid = ""
+        links = []
 
         # always re-create all album links - it is quite fast and a good way
         # to ensure consistency
@@ -256,6 +257,7 @@ class GoogleAlbumsSync(object):
             shutil.rmtree(self._links_root)
         re_download = not self._links_root.exists()
 
+        # work out the links in the main thread since this uses the DB
         for (
             path,
             file_name,
@@ -289,43 +291,66 @@ class GoogleAlbumsSync(object):
             link_folder: Path = self.album_folder_name(album_name, start_date, end_date)
 
             link_file = link_folder / "{:04d}_{}".format(album_item, file_name)
-            # incredibly, pathlib.Path.relative_to cannot handle
-            # '../' in a relative path !!! reverting to os.path
-            relative_filename = os.path.relpath(full_file_name, str(link_folder))
-            log.debug("adding album link %s -> %s", relative_filename, link_file)
-            try:
-                if not link_folder.is_dir():
-                    log.debug("new album folder %s", link_folder)
-                    link_folder.mkdir(parents=True)
-
-                created_date = Utils.string_to_date(created)
-                if full_file_name.exists():
-                    if self._use_hardlinks:
-                        os.link(full_file_name, link_file)
-                    else:
-                        link_file.symlink_to(relative_filename)
-                else:
-                    log.debug("skip link for %s, not downloaded", file_name)
-
-                if link_file.exists():
-                    count += 1
-                    # Windows tries to follow symlinks even though we specify
-                    # follow_symlinks=False. So disable setting of link date
-                    # if follow not supported
-                    try:
-                        if os.utime in os.supports_follow_symlinks:
-                            os.utime(
-                                str(link_file),
-                                (
-                                    Utils.safe_timestamp(created_date).timestamp(),
-                                    Utils.safe_timestamp(created_date).timestamp(),
-                                ),
-                                follow_symlinks=False,
-                            )
-                    except PermissionError:
-                        log.debug(f"cant set date on {link_file}")
-
-            except (FileExistsError, UnicodeEncodeError):
-                log.error("bad link to %s", full_file_name)
+            created_date = Utils.string_to_date(created)
+            links.append((full_file_name, link_folder, link_file, created_date))
+
+        # then farm out the file system work since each link is a few
+        # metadata syscalls that are dominated by file system latency
+        with futures.ThreadPoolExecutor(
+            max_workers=self.settings.max_threads
+        ) as link_pool:
+            count = sum(link_pool.map(lambda link: self.create_link(*link), links))
 
         log.warning("Created %d new album folder links", count)
+
+    def create_link(
+        self,
+        full_file_name: Path,
+        link_folder: Path,
+        link_file: Path,
+        created_date: datetime,
+    ) -> int:
+        """ Runs in a thread pool and creates a single album link.
+
+        Returns:
+            1 if the link exists once done, 0 otherwise
+        """
+        # incredibly, pathlib.Path.relative_to cannot handle
+        # '../' in a relative path !!! reverting to os.path
+        relative_filename = os.path.relpath(full_file_name, str(link_folder))
+        log.debug("adding album link %s -> %s", relative_filename, link_file)
+        try:
+            if not link_folder.is_dir():
+                log.debug("new album folder %s", link_folder)
+                # other threads may be creating the same folder
+                link_folder.mkdir(parents=True, exist_ok=True)
+
+            if full_file_name.exists():
+                if self._use_hardlinks:
+                    os.link(full_file_name, link_file)
+                else:
+                    link_file.symlink_to(relative_filename)
+            else:
+                log.debug("skip link for %s, not downloaded", full_file_name.name)
+
+            if link_file.exists():
+                # Windows tries to follow symlinks even though we specify
+                # follow_symlinks=False. So disable setting of link date
+                # if follow not supported
+                try:
+                    if os.utime in os.supports_follow_symlinks:
+                        os.utime(
+                            str(link_file),
+                            (
+                                Utils.safe_timestamp(created_date).timestamp(),
+                                Utils.safe_timestamp(created_date).timestamp(),
+                            ),
+                            follow_symlinks=False,
+                        )
+                except PermissionError:
+                    log.debug(f"cant set date on {link_file}")
+                return 1
+
+        except (FileExistsError, UnicodeEncodeError):
+            log.error("bad link to %s", full_file_name)
+        return 0
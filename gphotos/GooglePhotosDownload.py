@@ -11,7 +11,7 @@ from gphotos.GooglePhotosRow import GooglePhotosRow
 from gphotos.BadIds import BadIds
 
 from itertools import zip_longest
-from typing import Iterable, Mapping, Union, List
+from typing import Iterable, Mapping, Union, List, Set
 from datetime import datetime
 import logging
 import shutil
@@ -19,7 +19,7 @@ import tempfile
 import concurrent.futures as futures
 
 import requests
-from requests.exceptions import RequestException
+from requests.exceptions import RequestException, HTTPError
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
@@ -32,6 +32,8 @@ except ImportError:
     win32file, win32con = None, None
     _use_win_32 = False
 
+_use_fadvise = hasattr(os, "posix_fadvise")
+
 log = logging.getLogger(__name__)
 
 
@@ -41,6 +43,8 @@ class GooglePhotosDownload(object):
 
     PAGE_SIZE: int = 100
     BATCH_SIZE: int = 40
+    # copy downloads to disk in large blocks to keep write syscalls down
+    COPY_BUFFER_SIZE: int = 512 * 1024
 
     def __init__(
         self, api: RestClient, root_folder: Path, db: LocalData, settings: Settings
@@ -74,6 +78,10 @@ class GooglePhotosDownload(object):
         self.download_pool = futures.ThreadPoolExecutor(max_workers=self.max_threads)
         self.pool_future_to_media = {}
         self.bad_ids = BadIds(self._root_folder)
+        # folders known to exist, saves a stat per downloaded file
+        self.local_folders: Set[Path] = set()
+        # files downloaded in this phase, appended to by the download threads
+        self.written_files: List[Path] = []
 
         self.current_umask = os.umask(7)
         os.umask(self.current_umask)
@@ -110,6 +118,7 @@ class GooglePhotosDownload(object):
         if not self.retry_download:
             self.files_download_skipped = self._db.downloaded_count()
 
+        downloaded_before = self.files_downloaded
         log.warning("Downloading Photos ...")
         try:
             for media_items_block in grouper(
@@ -144,8 +153,9 @@ class GooglePhotosDownload(object):
 
                     elif self.bad_ids.check_id_ok(media_item.id):
                         batch[media_item.id] = media_item
-                        if not local_folder.is_dir():
-                            local_folder.mkdir(parents=True)
+                        if local_folder not in self.local_folders:
+                            local_folder.mkdir(parents=True, exist_ok=True)
+                            self.local_folders.add(local_folder)
 
                 if len(batch) > 0:
                     self.download_batch(batch)
@@ -153,6 +163,12 @@ class GooglePhotosDownload(object):
             # allow any remaining background downloads to complete
             futures_left = list(self.pool_future_to_media.keys())
             self.do_download_complete(futures_left)
+            # make the new files durable with a single sync rather than one
+            # per file, this is done before the DB records them as downloaded
+            if self.files_downloaded > downloaded_before and hasattr(os, "sync"):
+                os.sync()
+                self.drop_from_page_cache()
+            self.written_files = []
             log.warning(
                 "Downloaded %d Items, Failed %d, Already Downloaded %d",
                 self.files_downloaded,
@@ -163,6 +179,23 @@ class GooglePhotosDownload(object):
             self.bad_ids.report()
         return self.files_downloaded
 
+    def drop_from_page_cache(self):
+        """ The new files will not be read again soon so ask the kernel to
+        drop them from the page cache, leaving it for the index DB.
+        DONTNEED only evicts clean pages so this must follow os.sync()
+        """
+        if not _use_fadvise:
+            return
+        for path in self.written_files:
+            try:
+                fd = os.open(str(path), os.O_RDONLY)
+            except OSError:
+                continue
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+
     def download_batch(self, batch: Mapping[str, DatabaseMedia]):
         """ Downloads a batch of media items collected in download_photo_media.
 
@@ -190,8 +223,11 @@ class GooglePhotosDownload(object):
                 else:
                     media_item = batch.get(media_item_json["id"])
                     self.download_file(media_item, media_item_json)
-        except RequestException:
-            self.find_bad_items(batch)
+        except RequestException as e:
+            # only a 400 means an ID in the batch was rejected, anything else
+            # (outage, timeout, quota) would fail for every half as well
+            bisect = isinstance(e, HTTPError) and e.response.status_code == 400
+            self.find_bad_items(batch, bisect)
 
         except KeyboardInterrupt:
             log.warning("Cancelling download threads ...")
@@ -212,14 +248,12 @@ class GooglePhotosDownload(object):
         base_url = media_json["baseUrl"]
 
         # we dont want a massive queue so wait until at least one thread is free
-        while len(self.pool_future_to_media) >= self.max_threads:
-            # check which futures are done, complete the main thread work
-            # and remove them from the dictionary
-            done_list = []
-            for future in self.pool_future_to_media.keys():
-                if future.done():
-                    done_list.append(future)
-
+        if len(self.pool_future_to_media) >= self.max_threads:
+            # block (rather than spin) until some futures are done, complete
+            # the main thread work and remove them from the dictionary
+            done_list, _ = futures.wait(
+                self.pool_future_to_media, return_when=futures.FIRST_COMPLETED
+            )
             self.do_download_complete(done_list)
 
         # start a new background download
@@ -254,11 +288,12 @@ class GooglePhotosDownload(object):
         try:
             response = self._session.get(download_url, stream=True, timeout=timeout)
             response.raise_for_status()
-            shutil.copyfileobj(response.raw, temp_file)
+            shutil.copyfileobj(response.raw, temp_file, self.COPY_BUFFER_SIZE)
             temp_file.close()
             temp_file = None
             response.close()
             t_path.rename(local_full_path)
+            self.written_files.append(local_full_path)
             create_date = Utils.safe_timestamp(media_item.create_date)
             os.utime(
                 str(local_full_path),
@@ -337,11 +372,23 @@ class GooglePhotosDownload(object):
                     log.warning(f"Downloaded {self.files_downloaded} items ...\033[F")
             del self.pool_future_to_media[future]
 
-    def find_bad_items(self, batch: Mapping[str, DatabaseMedia]):
+    def find_bad_items(self, batch: Mapping[str, DatabaseMedia], bisect: bool):
         """
-        a batch get failed. Now do all of its contents as individual
-        gets so we can work out which ID(s) cause the failure
+        a batch get failed. If the service rejected an ID (bisect is True)
+        split the batch in half and retry each half with batchGet so that the
+        bad ID(s) are found in a few calls rather than one get per item.
+        Otherwise, and once down to a single item, do an individual get per
+        item so we can record which ID causes the failure.
+
+        A single bad ID in a batch of n costs about 2*log2(n) batchGets.
         """
+        if bisect and len(batch) > 1:
+            items = list(batch.items())
+            half = len(items) // 2
+            self.download_batch(dict(items[:half]))
+            self.download_batch(dict(items[half:]))
+            return
+
         for item_id, media_item in batch.items():
             try:
                 log.debug("BAD ID Retry on %s (%s)", item_id, media_item.relative_path)
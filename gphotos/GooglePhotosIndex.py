@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 # coding: utf8
+import concurrent.futures as futures
+import os
 from pathlib import Path
 from datetime import datetime
+from typing import Set, Tuple
 
 from gphotos import Utils
 from gphotos.GooglePhotosMedia import GooglePhotosMedia
@@ -43,20 +46,19 @@ class GooglePhotosIndex(object):
         self._use_flat_path: bool = settings.use_flat_path
         self._media_folder: Path = settings.photos_path
 
-    def check_for_removed_in_folder(self, folder: Path):
-        for pth in folder.iterdir():
-            if pth.is_dir():
-                self.check_for_removed_in_folder(pth)
-            else:
-                local_path = pth.relative_to(self._root_folder).parent
-                if pth.match(".*") or pth.match("gphotos*"):
-                    continue
-                file_row = self._db.get_file_by_path(
-                    GooglePhotosRow, local_path, pth.name
-                )
-                if not file_row:
-                    pth.unlink()
-                    log.warning("%s deleted", pth)
+    def check_for_removed_in_folder(self, folder: Path, indexed: Set[Tuple[str, str]]):
+        with os.scandir(str(folder)) as entries:
+            for entry in entries:
+                pth = Path(entry.path)
+                if entry.is_dir():
+                    self.check_for_removed_in_folder(pth, indexed)
+                else:
+                    local_path = pth.relative_to(self._root_folder).parent
+                    if pth.match(".*") or pth.match("gphotos*"):
+                        continue
+                    if (str(local_path), pth.name) not in indexed:
+                        pth.unlink()
+                        log.warning("%s deleted", pth)
 
     def check_for_removed(self):
         """ Removes local files that are no longer represented in the Photos
@@ -66,7 +68,11 @@ class GooglePhotosIndex(object):
         for a file to exist it must have been indexed in a previous scan
         """
         log.warning("Finding and removing deleted media ...")
-        self.check_for_removed_in_folder(self._root_folder / self._media_folder)
+        # one query for the whole index rather than one query per local file
+        indexed = self._db.get_file_paths(GooglePhotosRow)
+        self.check_for_removed_in_folder(
+            self._root_folder / self._media_folder, indexed
+        )
 
     def write_media_index(self, media: GooglePhotosMedia, update: bool = True):
         self._db.put_row(GooglePhotosRow.from_media(media), update)
@@ -147,78 +153,40 @@ class GooglePhotosIndex(object):
         else:
             start_date = self._db.get_scan_date()
 
-        items_json = self.search_media(
-            start_date=start_date,
-            end_date=self.end_date,
-            do_video=self.include_video,
-            favourites=self.favourites,
-        )
+        def search(page_token: str = None) -> dict:
+            return self.search_media(
+                page_token=page_token,
+                start_date=start_date,
+                end_date=self.end_date,
+                do_video=self.include_video,
+                favourites=self.favourites,
+            )
 
-        while items_json:
-            media_json = items_json.get("mediaItems", [])
-            items_count = 0
-            for media_item_json in media_json:
-                items_count += 1
-                total_listed += 1
-                media_item = GooglePhotosMedia(
-                    media_item_json, to_lower=self.case_insensitive_fs
-                )
-                media_item.set_path_by_date(self._media_folder, self._use_flat_path)
-                (num, row) = self._db.file_duplicate_no(
-                    str(media_item.filename),
-                    str(media_item.relative_folder),
-                    media_item.id,
-                )
-                # we just learned if there were any duplicates in the db
-                media_item.duplicate_number = num
+        # request the next page in the background while the current page is
+        # written to the index, so API latency overlaps with the DB work
+        next_items = None
+        with futures.ThreadPoolExecutor(max_workers=1) as page_pool:
+            try:
+                items_json = search()
+                while items_json:
+                    next_page = items_json.get("nextPageToken")
+                    if next_page:
+                        next_items = page_pool.submit(search, next_page)
+                    else:
+                        next_items = None
 
-                if self.settings.progress and total_listed % 10 == 0:
-                    log.warning(f"Listed {total_listed} items ...\033[F")
-                if not row:
-                    self.files_indexed += 1
-                    log.info(
-                        "Indexed %d %s", self.files_indexed, media_item.relative_path
-                    )
-                    self.write_media_index(media_item, False)
-                    if self.files_indexed % 2000 == 0:
-                        self._db.store()
-                elif media_item.modify_date > row.modify_date:
-                    self.files_indexed += 1
-                    # todo at present there is no modify date in the API
-                    #  so updates cannot be monitored - this won't get called
-                    log.info(
-                        "Updated Index %d %s",
-                        self.files_indexed,
-                        media_item.relative_path,
-                    )
-                    self.write_media_index(media_item, True)
-                else:
-                    self.files_index_skipped += 1
-                    log.debug(
-                        "Skipped Index (already indexed) %d %s",
-                        self.files_index_skipped,
-                        media_item.relative_path,
-                    )
-                    self.latest_download = max(
-                        self.latest_download, media_item.create_date
+                    total_listed = self.index_page(
+                        items_json.get("mediaItems", []), total_listed
                     )
-            log.debug(
-                "search_media parsed %d media_items with %d PAGE_SIZE",
-                items_count,
-                GooglePhotosIndex.PAGE_SIZE,
-            )
 
-            next_page = items_json.get("nextPageToken")
-            if next_page:
-                items_json = self.search_media(
-                    page_token=next_page,
-                    start_date=start_date,
-                    end_date=self.end_date,
-                    do_video=self.include_video,
-                    favourites=self.favourites,
-                )
-            else:
-                break
+                    if not next_items:
+                        break
+                    items_json = next_items.result()
+            finally:
+                # if indexing failed or was cancelled do not leave a page
+                # request queued behind it
+                if next_items:
+                    next_items.cancel()
 
         # scan (in reverse date order) completed so the next incremental scan
         # can start from the most recent file in this scan
@@ -228,6 +196,61 @@ class GooglePhotosIndex(object):
         log.warning(f"indexed {self.files_indexed} items")
         return self.files_indexed
 
+    def index_page(self, media_json: list, total_listed: int) -> int:
+        """ Write one page of mediaItems search results to the index.
+
+        Returns:
+            the running count of items listed
+        """
+        items_count = 0
+        for media_item_json in media_json:
+            items_count += 1
+            total_listed += 1
+            media_item = GooglePhotosMedia(
+                media_item_json, to_lower=self.case_insensitive_fs
+            )
+            media_item.set_path_by_date(self._media_folder, self._use_flat_path)
+            (num, row) = self._db.file_duplicate_no(
+                str(media_item.filename),
+                str(media_item.relative_folder),
+                media_item.id,
+            )
+            # we just learned if there were any duplicates in the db
+            media_item.duplicate_number = num
+
+            if self.settings.progress and total_listed % 10 == 0:
+                log.warning(f"Listed {total_listed} items ...\033[F")
+            if not row:
+                self.files_indexed += 1
+                log.info("Indexed %d %s", self.files_indexed, media_item.relative_path)
+                self.write_media_index(media_item, False)
+                if self.files_indexed % 2000 == 0:
+                    self._db.store()
+            elif media_item.modify_date > row.modify_date:
+                self.files_indexed += 1
+                # todo at present there is no modify date in the API
+                #  so updates cannot be monitored - this won't get called
+                log.info(
+                    "Updated Index %d %s",
+                    self.files_indexed,
+                    media_item.relative_path,
+                )
+                self.write_media_index(media_item, True)
+            else:
+                self.files_index_skipped += 1
+                log.debug(
+                    "Skipped Index (already indexed) %d %s",
+                    self.files_index_skipped,
+                    media_item.relative_path,
+                )
+                self.latest_download = max(self.latest_download, media_item.create_date)
+        log.debug(
+            "search_media parsed %d media_items with %d PAGE_SIZE",
+            items_count,
+            GooglePhotosIndex.PAGE_SIZE,
+        )
+        return total_listed
+
     def get_extra_meta(self):
         count = 0
         log.warning(
@@ -4,7 +4,7 @@ import sqlite3 as lite
 from datetime import datetime
 from pathlib import Path
 from sqlite3.dbapi2 import Connection, Cursor
-from typing import Iterator, Type
+from typing import Iterator, List, Set, Tuple, Type
 
 # todo this module could be tidied quite a bit
 #  too much application logic at this level in some cases
@@ -24,6 +24,7 @@ class LocalData:
     DB_FILE_NAME: str = "gphotos.sqlite"
     BLOCK_SIZE: int = 10000
     VERSION: float = 5.7
+    MMAP_SIZE: int = 256 * 1024 * 1024
 
     def __init__(self, root_folder: Path, flush_index: bool = False):
         """ Initialize a connection to the DB and create some cursors.
@@ -39,16 +40,19 @@ class LocalData:
         self.db_file: Path = root_folder / LocalData.DB_FILE_NAME
         if not self.db_file.exists():
             clean_db = True
+            # a WAL without its DB is stale and must not be replayed into
+            # the new DB
+            for wal_file in self.wal_files(self.db_file):
+                if wal_file.exists():
+                    wal_file.unlink()
         elif flush_index:
             clean_db = True
             self.backup_sql_file()
 
-        self.con: Connection = lite.connect(str(self.db_file), check_same_thread=False)
-        self.con.row_factory = lite.Row
-        self.cur: Cursor = self.con.cursor()
-        # second cursor for iterator functions so they can interleave with
-        # others
-        self.cur2: Cursor = self.con.cursor()
+        self.con: Connection = None
+        self.cur: Cursor = None
+        self.cur2: Cursor = None
+        self.connect()
         if clean_db:
             self.clean_db()
         self.check_schema_version()
@@ -56,11 +60,43 @@ class LocalData:
     def __enter__(self):
         return self
 
+    def connect(self):
+        """ Open the DB connection and cursors.
+
+        WAL journaling with synchronous=NORMAL means a commit appends to the
+        write-ahead log without an fsync, the log is only synced when it is
+        checkpointed back into the DB. This is still safe against corruption
+        on a crash, at worst the last few commits are lost.
+        """
+        self.con = lite.connect(str(self.db_file), check_same_thread=False)
+        self.con.row_factory = lite.Row
+        self.con.execute("PRAGMA journal_mode=WAL;")
+        self.con.execute("PRAGMA synchronous=NORMAL;")
+        self.con.execute("PRAGMA temp_store=MEMORY;")
+        self.con.execute("PRAGMA mmap_size={};".format(LocalData.MMAP_SIZE))
+        self.cur = self.con.cursor()
+        # second cursor for iterator functions so they can interleave with
+        # others
+        self.cur2 = self.con.cursor()
+
     def backup_sql_file(self):
         backup = self.db_file.parent / (self.db_file.name + ".previous")
         if backup.exists():
             backup.unlink()
         self.db_file.rename(backup)
+        # move any WAL left by an unclean shutdown with its DB so that it
+        # cannot be replayed into the new one
+        for wal_file, wal_backup in zip(
+            self.wal_files(self.db_file), self.wal_files(backup)
+        ):
+            if wal_backup.exists():
+                wal_backup.unlink()
+            if wal_file.exists():
+                wal_file.rename(wal_backup)
+
+    @staticmethod
+    def wal_files(db_file: Path) -> List[Path]:
+        return [db_file.parent / (db_file.name + s) for s in ("-wal", "-shm")]
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """ Always clean up and close the connection when this object is
@@ -88,10 +124,7 @@ class LocalData:
             self.con.commit()
             self.con.close()
             self.backup_sql_file()
-            self.con = lite.connect(str(self.db_file))
-            self.con.row_factory = lite.Row
-            self.cur = self.con.cursor()
-            self.cur2 = self.con.cursor()
+            self.connect()
             self.clean_db()
 
     def clean_db(self):
@@ -238,6 +271,16 @@ class LocalData:
         record = self.cur.fetchone()
         return row_type(record).to_media()
 
+    # noinspection SqlResolve
+    def get_file_paths(self, row_type: Type[DbRow]) -> Set[Tuple[str, str]]:
+        """
+        Fetch the (Path, FileName) of every entry in a media table, for
+        checking many local files against the index with a single query
+        """
+        query = "SELECT Path, FileName FROM {0};".format(row_type.table)
+        self.cur.execute(query)
+        return {(record["Path"], record["FileName"]) for record in self.cur}
+
     # functions for managing the SyncFiles Table ##############################
 
     # todo this could be generic and support Albums and LocalFiles too
@@ -1,6 +1,9 @@
+import atexit
 import sys
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 # add a trace level for logging all API calls to Google
@@ -92,11 +95,22 @@ def setup_logging(log_level: str, log_filename: Path, folder: Path):
     stdout_handler.setFormatter(formatter)
     stderr_handler.setFormatter(formatter)
 
-    # add the handlers to the root logger
-    logging.getLogger().addHandler(stdout_handler)
-    logging.getLogger().addHandler(stderr_handler)
-    logging.getLogger().addHandler(log_handler)
-    logging.getLogger().addHandler(trace_handler)
+    # the root logger only queues records, the handlers format and write them
+    # on a listener thread so that download threads do not contend for the
+    # handler locks and console I/O
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(
+        log_queue,
+        stdout_handler,
+        stderr_handler,
+        log_handler,
+        trace_handler,
+        respect_handler_level=True,
+    )
+    listener.start()
+    # flush any queued records on exit
+    atexit.register(listener.stop)
+    logging.getLogger().addHandler(QueueHandler(log_queue))
     # set logging level for root logger
     # always do debug for the log file, drop to trace if requested
     logging.getLogger().setLevel(min(numeric_level, logging.DEBUG))
@@ -2,24 +2,30 @@
 import logging
 import os
 import sys
+import time
 from argparse import ArgumentParser, Namespace
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from appdirs import AppDirs
 from gphotos import Utils
-from gphotos.authorize import Authorize
 from gphotos.Checks import do_check, get_check
-from gphotos.GoogleAlbumsSync import GoogleAlbumsSync
-from gphotos.GooglePhotosDownload import GooglePhotosDownload
-from gphotos.GooglePhotosIndex import GooglePhotosIndex
 from gphotos.LocalData import LocalData
-from gphotos.LocalFilesScan import LocalFilesScan
 from gphotos.Logging import setup_logging
-from gphotos.restclient import RestClient
-from gphotos.Settings import Settings
 from gphotos import __version__
 
+# the API, download and album modules pull in requests and oauthlib.
+# They are imported in setup() so that --help and the 'database is locked'
+# exit path do not pay for loading them
+if TYPE_CHECKING:
+    from gphotos.authorize import Authorize
+    from gphotos.GoogleAlbumsSync import GoogleAlbumsSync
+    from gphotos.GooglePhotosDownload import GooglePhotosDownload
+    from gphotos.GooglePhotosIndex import GooglePhotosIndex
+    from gphotos.LocalFilesScan import LocalFilesScan
+    from gphotos.restclient import RestClient
+
 if os.name == "nt":
     import subprocess
 
@@ -43,15 +49,15 @@ log = logging.getLogger(__name__)
 class GooglePhotosSyncMain:
     def __init__(self):
         self.data_store: LocalData = None
-        self.google_photos_client: RestClient = None
-        self.google_photos_idx: GooglePhotosIndex = None
-        self.google_photos_down: GooglePhotosDownload = None
-        self.google_albums_sync: GoogleAlbumsSync = None
-        self.local_files_scan: LocalFilesScan = None
+        self.google_photos_client: "RestClient" = None
+        self.google_photos_idx: "GooglePhotosIndex" = None
+        self.google_photos_down: "GooglePhotosDownload" = None
+        self.google_albums_sync: "GoogleAlbumsSync" = None
+        self.local_files_scan: "LocalFilesScan" = None
         self._start_date = None
         self._end_date = None
 
-        self.auth: Authorize = None
+        self.auth: "Authorize" = None
 
     try:
         version_string = "version: {}, database schema version {}".format(
@@ -60,199 +66,218 @@ class GooglePhotosSyncMain:
     except TypeError:
         version_string = "(version not available)"
 
-    parser = ArgumentParser(
-        epilog=version_string, description="Google Photos download tool"
-    )
-    parser.add_argument(
-        "root_folder", help="root of the local folders to download into"
-    )
-    parser.add_argument(
-        "--album",
-        action="store",
-        help="only synchronize the contents of a single album."
-        'use quotes e.g. "album name" for album names with spaces',
-    )
-    parser.add_argument(
-        "--log-level",
-        help="Set log level. Options: critical, error, warning, info, debug, trace. "
-        "trace logs all Google API calls to a file with suffix .trace",
-        default="warning",
-    )
-    parser.add_argument(
-        "--logfile",
-        action="store",
-        help="full path to debug level logfile, default: <root>/gphotos.log."
-        "If a directory is specified then a unique filename will be"
-        "generated.",
-    )
-    parser.add_argument(
-        "--compare-folder",
-        action="store",
-        help="root of the local folders to compare to the Photos Library",
-    )
-    parser.add_argument(
-        "--favourites-only",
-        action="store_true",
-        help="only download media marked as favourite (star)",
-    )
-    parser.add_argument(
-        "--flush-index",
-        action="store_true",
-        help="delete the index db, re-scan everything",
-    )
-    parser.add_argument(
-        "--rescan",
-        action="store_true",
-        help="rescan entire library, ignoring last scan date. Use this if you "
-        "have added photos to the library that "
-        "predate the last sync, or you have deleted some of the local "
-        "files",
-    )
-    parser.add_argument(
-        "--retry-download",
-        action="store_true",
-        help="check for the existence of files marked as already downloaded "
-        "and re-download any missing ones. Use "
-        "this if you have deleted some local files",
-    )
-    parser.add_argument(
-        "--skip-video", action="store_true", help="skip video types in sync"
-    )
-    parser.add_argument(
-        "--skip-shared-albums",
-        action="store_true",
-        help="skip albums that only appear in 'Sharing'",
-    )
-    parser.add_argument(
-        "--album-date-by-first-photo",
-        action="store_true",
-        help="Make the album date the same as its earliest "
-        "photo. The default is its last photo",
-    )
-    parser.add_argument(
-        "--start-date",
-        help="Set the earliest date of files to sync" "format YYYY-MM-DD",
-        default=None,
-    )
-    parser.add_argument(
-        "--end-date",
-        help="Set the latest date of files to sync" "format YYYY-MM-DD",
-        default=None,
-    )
-    parser.add_argument(
-        "--db-path",
-        help="Specify a pre-existing folder for the index database. "
-        "Defaults to the root of the local download folders",
-        default=None,
-    )
-    parser.add_argument(
-        "--albums-path",
-        help="Specify a folder for the albums "
-        "Defaults to the 'albums' in the local download folders",
-        default="albums",
-    )
-    parser.add_argument(
-        "--photos-path",
-        help="Specify a folder for the photo files. "
-        "Defaults to the 'photos' in the local download folders",
-        default="photos",
-    )
-    parser.add_argument(
-        "--use-flat-path",
-        action="store_true",
-        help="Mandate use of a flat directory structure ('YYYY-MMM') and not "
-        "a nested one ('YYYY/MM') . ",
-    )
-    parser.add_argument(
-        "--omit-album-date",
-        action="store_true",
-        help="Don't include year and month in album folder names.",
-    )
-    parser.add_argument("--new-token", action="store_true", help="Request new token")
-    parser.add_argument(
-        "--index-only",
-        action="store_true",
-        help="Only build the index of files in .gphotos.db - no downloads",
-    )
-    parser.add_argument(
-        "--skip-index",
-        action="store_true",
-        help="Use index from previous run and start download immediately",
-    )
-    parser.add_argument(
-        "--do-delete",
-        action="store_true",
-        help="""Remove local copies of files that were deleted.
-        Must be used with --flush-index since the deleted items must be removed
-        from the index""",
-    )
-    parser.add_argument(
-        "--skip-files",
-        action="store_true",
-        help="Dont download files, just refresh the album links (for testing)",
-    )
-    parser.add_argument(
-        "--skip-albums", action="store_true", help="Dont download albums (for testing)"
-    )
-    parser.add_argument(
-        "--use-hardlinks",
-        action="store_true",
-        help="Use hardlinks instead of symbolic links in albums and comparison"
-        " folders",
-    )
-    parser.add_argument(
-        "--no-album-index",
-        action="store_true",
-        help="only index the photos library - skip indexing of folder contents "
-        "(for testing)",
-    )
-    parser.add_argument(
-        "--case-insensitive-fs",
-        action="store_true",
-        help="add this flag if your filesystem is case insensitive",
-    )
-    parser.add_argument(
-        "--max-retries",
-        help="Set the number of retries on network timeout / failures",
-        default=5,
-    )
-    parser.add_argument(
-        "--max-threads",
-        help="Set the number of concurrent threads to use for parallel "
-        "download of media - reduce this number if network load is "
-        "excessive",
-        default=20,
-    )
-    parser.add_argument(
-        "--secret",
-        help="Path to client secret file (by default this is in the "
-        "application config directory)",
-    )
-    parser.add_argument(
-        "--archived",
-        action="store_true",
-        help="Download media items that have been marked as archived",
-    )
-    parser.add_argument(
-        "--progress",
-        action="store_true",
-        help="show progress of indexing and downloading in warning log",
-    )
-    parser.add_argument(
-        "--max-filename",
-        help="Set the maxiumum filename length for target filesystem."
-        "This overrides the automatic detection.",
-        default=0,
-    )
-    parser.add_argument(
-        "--ntfs",
-        action="store_true",
-        help="Declare that the target filesystem is ntfs (or ntfs like)."
-        "This overrides the automatic detection.",
-    )
-    parser.add_help = True
+    @classmethod
+    @lru_cache(maxsize=1)
+    def _get_parser(cls) -> ArgumentParser:
+        """ Build the command line parser on first use rather than at
+        class definition """
+        parser = ArgumentParser(
+            epilog=cls.version_string, description="Google Photos download tool"
+        )
+        parser.add_argument(
+            "root_folder", help="root of the local folders to download into"
+        )
+        parser.add_argument(
+            "--album",
+            action="store",
+            help="only synchronize the contents of a single album."
+            'use quotes e.g. "album name" for album names with spaces',
+        )
+        parser.add_argument(
+            "--log-level",
+            help="Set log level. Options: critical, error, warning, info, debug, "
+            "trace. trace logs all Google API calls to a file with suffix .trace",
+            default="warning",
+        )
+        parser.add_argument(
+            "--logfile",
+            action="store",
+            help="full path to debug level logfile, default: <root>/gphotos.log."
+            "If a directory is specified then a unique filename will be"
+            "generated.",
+        )
+        parser.add_argument(
+            "--compare-folder",
+            action="store",
+            help="root of the local folders to compare to the Photos Library",
+        )
+        parser.add_argument(
+            "--favourites-only",
+            action="store_true",
+            help="only download media marked as favourite (star)",
+        )
+        parser.add_argument(
+            "--flush-index",
+            action="store_true",
+            help="delete the index db, re-scan everything",
+        )
+        parser.add_argument(
+            "--rescan",
+            action="store_true",
+            help="rescan entire library, ignoring last scan date. Use this if you "
+            "have added photos to the library that "
+            "predate the last sync, or you have deleted some of the local "
+            "files",
+        )
+        parser.add_argument(
+            "--retry-download",
+            action="store_true",
+            help="check for the existence of files marked as already downloaded "
+            "and re-download any missing ones. Use "
+            "this if you have deleted some local files",
+        )
+        parser.add_argument(
+            "--skip-video", action="store_true", help="skip video types in sync"
+        )
+        parser.add_argument(
+            "--skip-shared-albums",
+            action="store_true",
+            help="skip albums that only appear in 'Sharing'",
+        )
+        parser.add_argument(
+            "--album-date-by-first-photo",
+            action="store_true",
+            help="Make the album date the same as its earliest "
+            "photo. The default is its last photo",
+        )
+        parser.add_argument(
+            "--start-date",
+            help="Set the earliest date of files to sync" "format YYYY-MM-DD",
+            default=None,
+        )
+        parser.add_argument(
+            "--end-date",
+            help="Set the latest date of files to sync" "format YYYY-MM-DD",
+            default=None,
+        )
+        parser.add_argument(
+            "--db-path",
+            help="Specify a pre-existing folder for the index database. "
+            "Defaults to the root of the local download folders",
+            default=None,
+        )
+        parser.add_argument(
+            "--albums-path",
+            help="Specify a folder for the albums "
+            "Defaults to the 'albums' in the local download folders",
+            default="albums",
+        )
+        parser.add_argument(
+            "--photos-path",
+            help="Specify a folder for the photo files. "
+            "Defaults to the 'photos' in the local download folders",
+            default="photos",
+        )
+        parser.add_argument(
+            "--use-flat-path",
+            action="store_true",
+            help="Mandate use of a flat directory structure ('YYYY-MMM') and not "
+            "a nested one ('YYYY/MM') . ",
+        )
+        parser.add_argument(
+            "--omit-album-date",
+            action="store_true",
+            help="Don't include year and month in album folder names.",
+        )
+        parser.add_argument(
+            "--new-token", action="store_true", help="Request new token"
+        )
+        parser.add_argument(
+            "--index-only",
+            action="store_true",
+            help="Only build the index of files in .gphotos.db - no downloads",
+        )
+        parser.add_argument(
+            "--skip-index",
+            action="store_true",
+            help="Use index from previous run and start download immediately",
+        )
+        parser.add_argument(
+            "--do-delete",
+            action="store_true",
+            help="""Remove local copies of files that were deleted.
+            Must be used with --flush-index since the deleted items must be removed
+            from the index""",
+        )
+        parser.add_argument(
+            "--skip-files",
+            action="store_true",
+            help="Dont download files, just refresh the album links (for testing)",
+        )
+        parser.add_argument(
+            "--skip-albums",
+            action="store_true",
+            help="Dont download albums (for testing)",
+        )
+        parser.add_argument(
+            "--use-hardlinks",
+            action="store_true",
+            help="Use hardlinks instead of symbolic links in albums and comparison"
+            " folders",
+        )
+        parser.add_argument(
+            "--no-album-index",
+            action="store_true",
+            help="only index the photos library - skip indexing of folder contents "
+            "(for testing)",
+        )
+        parser.add_argument(
+            "--case-insensitive-fs",
+            action="store_true",
+            help="add this flag if your filesystem is case insensitive",
+        )
+        parser.add_argument(
+            "--max-retries",
+            help="Set the number of retries on network timeout / failures",
+            default=5,
+        )
+        parser.add_argument(
+            "--max-threads",
+            help="Set the number of concurrent threads to use for parallel "
+            "download of media - reduce this number if network load is "
+            "excessive",
+            default=20,
+        )
+        parser.add_argument(
+            "--secret",
+            help="Path to client secret file (by default this is in the "
+            "application config directory)",
+        )
+        parser.add_argument(
+            "--archived",
+            action="store_true",
+            help="Download media items that have been marked as archived",
+        )
+        parser.add_argument(
+            "--progress",
+            action="store_true",
+            help="show progress of indexing and downloading in warning log",
+        )
+        parser.add_argument(
+            "--max-filename",
+            help="Set the maxiumum filename length for target filesystem."
+            "This overrides the automatic detection.",
+            default=0,
+        )
+        parser.add_argument(
+            "--ntfs",
+            action="store_true",
+            help="Declare that the target filesystem is ntfs (or ntfs like)."
+            "This overrides the automatic detection.",
+        )
+        parser.add_help = True
+        return parser
 
     def setup(self, args: Namespace, db_path: Path):
+        from appdirs import AppDirs
+        from gphotos.authorize import Authorize
+        from gphotos.GoogleAlbumsSync import GoogleAlbumsSync
+        from gphotos.GooglePhotosDownload import GooglePhotosDownload
+        from gphotos.GooglePhotosIndex import GooglePhotosIndex
+        from gphotos.LocalFilesScan import LocalFilesScan
+        from gphotos.restclient import RestClient
+        from gphotos.Settings import Settings
+
         root_folder = Path(args.root_folder).absolute()
 
         compare_folder = None
@@ -267,8 +292,11 @@ class GooglePhotosSyncMain:
             secret_file = Path(args.secret)
         else:
             secret_file = Path(app_dirs.user_config_dir) / "client_secret.json"
-        if args.new_token and credentials_file.exists():
-            credentials_file.unlink()
+        if args.new_token:
+            try:
+                credentials_file.unlink()
+            except FileNotFoundError:
+                pass
 
         scope = [
             "https://www.googleapis.com/auth/photoslibrary.readonly",
@@ -278,10 +306,16 @@ class GooglePhotosSyncMain:
             "https://photoslibrary.googleapis.com/$discovery" "/rest?version=v1"
         )
 
-        self.auth = Authorize(
-            scope, credentials_file, secret_file, int(args.max_retries)
-        )
-        self.auth.authorize()
+        # runs that only work on the local index and files skip the OAuth
+        # token refresh and the fetch of the API description
+        if self.needs_api(args):
+            self.auth = Authorize(
+                scope, credentials_file, secret_file, int(args.max_retries)
+            )
+            self.auth.authorize()
+            self.google_photos_client = RestClient(
+                photos_api_url, self.auth.session, db_path / ".gphotos.discovery"
+            )
 
         settings = Settings(
             start_date=Utils.string_to_date(args.start_date),
@@ -306,7 +340,6 @@ class GooglePhotosSyncMain:
             progress=args.progress,
         )
 
-        self.google_photos_client = RestClient(photos_api_url, self.auth.session)
         self.google_photos_idx = GooglePhotosIndex(
             self.google_photos_client, root_folder, self.data_store, settings
         )
@@ -368,6 +401,15 @@ class GooglePhotosSyncMain:
     def start(self, args: Namespace):
         self.do_sync(args)
 
+    @staticmethod
+    def needs_api(args: Namespace) -> bool:
+        """ Determine if do_sync will make any calls to the Photos API with
+        these arguments. Indexing, downloading and album indexing do,
+        album links, deletion and local comparison work from the index """
+        indexing = not args.skip_index
+        downloading = not (args.index_only or args.skip_files)
+        return indexing or downloading or args.album is not None or args.new_token
+
     @staticmethod
     def fs_checks(root_folder: Path, args: dict):
         Utils.minimum_date(root_folder)
@@ -387,12 +429,14 @@ class GooglePhotosSyncMain:
 
     def main(self, test_args: dict = None):
         start_time = datetime.now()
-        args = self.parser.parse_args(test_args)
+        # elapsed time uses the monotonic clock so NTP or DST changes during
+        # a long sync do not skew it
+        start_clock = time.monotonic()
+        args = self._get_parser().parse_args(test_args)
 
         root_folder = Path(args.root_folder).absolute()
         db_path = Path(args.db_path) if args.db_path else root_folder
-        if not root_folder.exists():
-            root_folder.mkdir(parents=True, mode=0o700)
+        root_folder.mkdir(parents=True, exist_ok=True, mode=0o700)
 
         setup_logging(args.log_level, args.logfile, root_folder)
         log.warning(f"gphotos-sync {__version__} {start_time}")
@@ -400,11 +444,12 @@ class GooglePhotosSyncMain:
         args = self.fs_checks(root_folder, args)
 
         lock_file = db_path / "gphotos.lock"
-        fp = lock_file.open("w")
-        with fp:
+        # open without truncating since another sync may be holding the lock
+        lock_fd = os.open(str(lock_file), os.O_WRONLY | os.O_CREAT, 0o600)
+        try:
             try:
                 if os.name != "nt":
-                    fcntl.lockf(fp, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    fcntl.lockf(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
             except IOError:
                 log.warning("EXITING: database is locked")
                 sys.exit(0)
@@ -423,8 +468,10 @@ class GooglePhotosSyncMain:
                 log.error("\nProcess failed.", exc_info=True)
             finally:
                 log.warning("Done.")
+        finally:
+            os.close(lock_fd)
 
-        elapsed_time = datetime.now() - start_time
+        elapsed_time = timedelta(seconds=time.monotonic() - start_clock)
         log.info("Elapsed time = %s", elapsed_time)
 
 
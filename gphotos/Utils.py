@@ -67,25 +67,22 @@ def minimum_date(root_folder: Path) -> datetime:
     return MINIMUM_DATE
 
 
-def date_string_normalize(
-    date_in: str, pattern_in: PatType, pattern_out: str
-) -> datetime:
+def date_string_normalize(date_in: str, pattern_in: PatType) -> datetime:
+    # this is called for every media item read from the API or the DB so
+    # build the datetime from the matched fields rather than use strptime
     result = None
     matches = pattern_in.match(date_in)
     if matches:
-        normalized = pattern_out.format(*matches.groups())
-        result = datetime.strptime(normalized, DATE_FORMAT)
+        result = datetime(*(int(field) for field in matches.groups()))
     return result
 
 
 def string_to_date(date_string: str) -> datetime:
     result = None
     if date_string:
-        result = date_string_normalize(date_string, DATE_NORMALIZE, "{}-{}-{} {}:{}:{}")
+        result = date_string_normalize(date_string, DATE_NORMALIZE)
         if result is None:
-            result = date_string_normalize(
-                date_string, SHORT_DATE_NORMALIZE, "{}-{}-{} 00:00:00"
-            )
+            result = date_string_normalize(date_string, SHORT_DATE_NORMALIZE)
         if result is None:
             log.warning("WARNING: time string %s illegal", date_string)
 
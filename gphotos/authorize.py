@@ -34,6 +34,7 @@ class Authorize:
             this file
             secrets_file: full path of the client secrets file obtained from
             Google Api Console
+            max_retries: number of retries on network or server errors
         """
         self.max_retries = max_retries
         self.scope: List[str] = scope
@@ -112,7 +113,7 @@ class Authorize:
         retries = Retry(
             total=self.max_retries,
             backoff_factor=0.5,
-            status_forcelist=[500, 502, 503, 504],
+            status_forcelist=[429, 500, 502, 503, 504],
             method_whitelist=frozenset(["GET", "POST"]),
             raise_on_status=False,
             respect_retry_after_header=True,
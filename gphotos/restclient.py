@@ -1,4 +1,5 @@
-from json import dumps
+from json import dumps, dump, load, JSONDecodeError
+from pathlib import Path
 from typing import Dict, List, Union, Any
 from requests import Session
 from requests.exceptions import BaseHTTPError
@@ -32,10 +33,16 @@ class RestClient:
         https://developers.google.com/discovery/v1/using
     """
 
-    def __init__(self, api_url: str, auth_session: Session):
-        """ """
+    def __init__(self, api_url: str, auth_session: Session, cache_file: Path = None):
+        """
+        Parameters:
+            api_url: URL of the discovery document for the API
+            auth_session: an authorized requests session
+            cache_file: optional file in which to keep the discovery document
+                between runs
+        """
         self.auth_session: Session = auth_session
-        service_document = self.auth_session.get(api_url).json()
+        service_document = self.get_service_document(api_url, cache_file)
         self.json: JSONType = service_document
         self.base_url: str = str(service_document["baseUrl"])
         for c_name, collection in service_document["resources"].items():
@@ -45,6 +52,35 @@ class RestClient:
                 new_method = Method(self, **method)
                 setattr(new_collection, m_name, new_method)
 
+    def get_service_document(self, api_url: str, cache_file: Path = None) -> JSONType:
+        """ Fetch the discovery document. If there is a cached copy send its
+        ETag in If-None-Match so that the server can reply 304 Not Modified
+        instead of sending the whole document again """
+        cached_document = None
+        headers = {}
+        if cache_file:
+            try:
+                with cache_file.open("r") as stream:
+                    cached = load(stream)
+                # only use the cache if it is complete
+                etag, cached_document = cached["etag"], cached["document"]
+                headers["If-None-Match"] = etag
+            except (JSONDecodeError, IOError, KeyError, TypeError):
+                cached_document = None
+
+        response = self.auth_session.get(api_url, headers=headers)
+        if cached_document and response.status_code == 304:
+            log.debug("discovery document not modified, using cached copy")
+            return cached_document
+
+        service_document = response.json()
+        etag = response.headers.get("ETag")
+        # never cache an error response
+        if cache_file and etag and response.status_code == 200:
+            with cache_file.open("w") as stream:
+                dump({"etag": etag, "document": service_document}, stream)
+        return service_document
+
 
 # pylint: disable=no-member
 class Method:
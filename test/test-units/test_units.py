@@ -3,13 +3,19 @@ from datetime import datetime
 from os import environ
 from os import name as os_name
 from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import Mock
 import test.test_setup as ts
 
 import gphotos.authorize as auth
 from gphotos.Checks import do_check, get_check
 from gphotos.GoogleAlbumMedia import GoogleAlbumMedia
+from gphotos.GooglePhotosDownload import GooglePhotosDownload
 from gphotos.LocalFilesMedia import LocalFilesMedia
+from gphotos.Main import GooglePhotosSyncMain
+from gphotos.restclient import RestClient
+import gphotos.Utils as Utils
 from requests import exceptions as exc
 
 import pytest
@@ -157,3 +163,124 @@ class TestUnits(TestCase):
             s.gp.fs_checks(s.root, s.parsed_args)
             self.assertTrue(get_check().is_linux)
             self.assertEquals(get_check().max_filename, 255)
+
+    def test_discovery_cache(self):
+        document = {"baseUrl": "https://example.com/", "resources": {}}
+        session = Mock()
+        session.get.return_value = Mock(
+            status_code=200, headers={"ETag": '"v1"'}, json=lambda: document
+        )
+        with TemporaryDirectory() as folder:
+            cache_file = Path(folder) / ".gphotos.discovery"
+            api = RestClient("https://example.com/$discovery", session, cache_file)
+            self.assertEqual(api.base_url, "https://example.com/")
+            session.get.assert_called_with("https://example.com/$discovery", headers={})
+
+            # second run revalidates the cached document
+            session.get.return_value = Mock(status_code=304, headers={})
+            api = RestClient("https://example.com/$discovery", session, cache_file)
+            self.assertEqual(api.base_url, "https://example.com/")
+            session.get.assert_called_with(
+                "https://example.com/$discovery", headers={"If-None-Match": '"v1"'}
+            )
+
+            # an error response is not cached over the good copy
+            session.get.return_value = Mock(
+                status_code=500, headers={"ETag": '"err"'}, json=lambda: {}
+            )
+            with self.assertRaises(KeyError):
+                RestClient("https://example.com/$discovery", session, cache_file)
+            session.get.return_value = Mock(status_code=304, headers={})
+            RestClient("https://example.com/$discovery", session, cache_file)
+            session.get.assert_called_with(
+                "https://example.com/$discovery", headers={"If-None-Match": '"v1"'}
+            )
+
+            # an incomplete cache is ignored
+            cache_file.write_text(json.dumps({"etag": '"v1"'}))
+            session.get.return_value = Mock(
+                status_code=200, headers={"ETag": '"v2"'}, json=lambda: document
+            )
+            RestClient("https://example.com/$discovery", session, cache_file)
+            session.get.assert_called_with("https://example.com/$discovery", headers={})
+
+    def test_needs_api(self):
+        parser = GooglePhotosSyncMain._get_parser()
+
+        def needs_api(*args):
+            parsed = parser.parse_args(["root"] + list(args))
+            return GooglePhotosSyncMain.needs_api(parsed)
+
+        self.assertTrue(needs_api())
+        self.assertTrue(needs_api("--skip-index"))
+        self.assertTrue(needs_api("--index-only"))
+        self.assertTrue(needs_api("--skip-index", "--index-only", "--album", "a"))
+        self.assertFalse(needs_api("--skip-index", "--index-only"))
+        self.assertFalse(needs_api("--skip-index", "--skip-files", "--do-delete"))
+
+    def test_string_to_date(self):
+        self.assertEqual(
+            Utils.string_to_date("2020-02-29T13:14:15Z"),
+            datetime(2020, 2, 29, 13, 14, 15),
+        )
+        self.assertEqual(
+            Utils.string_to_date("2019:01:02 03:04:05"), datetime(2019, 1, 2, 3, 4, 5)
+        )
+        self.assertEqual(Utils.string_to_date("2017-01-01"), datetime(2017, 1, 1))
+        self.assertIsNone(Utils.string_to_date("not a date"))
+        self.assertIsNone(Utils.string_to_date(None))
+        with self.assertRaises(ValueError):
+            Utils.string_to_date("2019-02-30")
+
+    @staticmethod
+    def make_bad_items_download(batch_get, get):
+        api = Mock()
+        api.mediaItems.batchGet.execute.side_effect = batch_get
+        api.mediaItems.get.execute.side_effect = get
+        settings = Mock(max_threads=1, max_retries=1, start_date=None, end_date=None)
+        with TemporaryDirectory() as folder:
+            down = GooglePhotosDownload(api, Path(folder), None, settings)
+        down.bad_ids = Mock()
+        down.download_file = Mock()
+        return api, down
+
+    def test_find_bad_items(self):
+        bad_id = "id05"
+        media = {
+            "id{:02d}".format(i): Mock(id="id{:02d}".format(i)) for i in range(16)
+        }
+
+        def bad_request():
+            return exc.HTTPError("400 Bad Request", response=Mock(status_code=400))
+
+        def batch_get(mediaItemIds):
+            ids = list(mediaItemIds)
+            if bad_id in ids:
+                raise bad_request()
+            results = [{"mediaItem": {"id": i, "baseUrl": "url"}} for i in ids]
+            return Mock(json=lambda: {"mediaItemResults": results})
+
+        def get(mediaItemId):
+            raise bad_request()
+
+        api, down = self.make_bad_items_download(batch_get, get)
+        down.download_batch(media)
+
+        downloaded = [c[0][0].id for c in down.download_file.call_args_list]
+        self.assertEqual(sorted(downloaded), sorted(set(media) - {bad_id}))
+        down.bad_ids.add_id.assert_called_once()
+        self.assertEqual(down.bad_ids.add_id.call_args[0][1], bad_id)
+        # one failed batch then two halves at each of the log2(16) levels
+        self.assertLessEqual(api.mediaItems.batchGet.execute.call_count, 9)
+        self.assertEqual(api.mediaItems.get.execute.call_count, 1)
+
+        # an outage is not a bad ID, so no bisection: one get per item
+        api, down = self.make_bad_items_download(
+            exc.ConnectionError("unreachable"), exc.ConnectionError("unreachable")
+        )
+        down.download_batch(media)
+
+        down.download_file.assert_not_called()
+        self.assertEqual(down.bad_ids.add_id.call_count, len(media))
+        self.assertEqual(api.mediaItems.batchGet.execute.call_count, 1)
+        self.assertLessEqual(api.mediaItems.get.execute.call_count, len(media))
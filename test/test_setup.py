@@ -61,7 +61,7 @@ class SetupDbAndCredentials:
         credentials_file = self.test_folder / ".gphotos.token"
         shutil.copy(credentials_file, self.root)
 
-        self.parsed_args = self.gp.parser.parse_args(all_args)
+        self.parsed_args = self.gp._get_parser().parse_args(all_args)
         self.parsed_args.root_folder = Path(self.parsed_args.root_folder)
         self.gp.setup(self.parsed_args, Path(self.root))
 